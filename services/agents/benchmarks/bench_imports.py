@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmarks for the agents package
+Each case runs in a fresh interpreter so module caches don't skew results
+
+Run from services/agents:
+    python benchmarks/bench_imports.py
+    python benchmarks/bench_imports.py --json                      # machine-readable
+    python benchmarks/bench_imports.py --output bench_imports.jsonl # append a record
+
+Exits non-zero if any case fails to run.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = int(os.getenv("BENCH_RUNS", "5"))
+
+# name -> code timed inside a fresh interpreter
+CASES = {
+    # What the scheduler/API pay now: tasks without langgraph
+    "lazy_tasks_import": "import flippilot_agents.tasks",
+    # What every job used to pay: tasks + langgraph + building the graph
+    "eager_baseline": (
+        "import langgraph.graph\n"
+        "import flippilot_agents.tasks as t\n"
+        "t.build_flippilot_graph()"
+    ),
+    # What the worker pays once in preloaded mode
+    "preload": "import flippilot_agents.tasks as t\nt.preload()",
+}
+
+TIMER = """
+import time
+_start = time.perf_counter()
+{code}
+print(time.perf_counter() - _start)
+"""
+
+def time_case(code):
+    """Time one case in a subprocess, returns (seconds, None) or (None, error)"""
+    proc = subprocess.run(
+        [sys.executable, "-c", TIMER.format(code=code)],
+        cwd=AGENTS_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return None, lines[-1] if lines else f"exit code {proc.returncode}"
+    return float(proc.stdout.strip().splitlines()[-1]), None
+
+def run_case(code, runs):
+    """Run one case `runs` times, returns a result dict"""
+    timings = []
+    for _ in range(runs):
+        seconds, error = time_case(code)
+        if error:
+            return {"ok": False, "error": error}
+        timings.append(seconds)
+    return {
+        "ok": True,
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "min_ms": round(min(timings) * 1000, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmarks for flippilot_agents")
+    parser.add_argument("--json", action="store_true", help="print a JSON record instead of a table")
+    parser.add_argument("--output", help="append the JSON record to this file (JSON lines)")
+    args = parser.parse_args()
+
+    results = {name: run_case(code, RUNS) for name, code in CASES.items()}
+    record = {
+        "benchmark": "imports",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "runs": RUNS,
+        "results": results,
+    }
+
+    if args.json:
+        print(json.dumps(record))
+    else:
+        print(f"⏱️  IMPORT BENCHMARKS ({RUNS} runs each)")
+        print("=" * 60)
+        for name, result in results.items():
+            if result["ok"]:
+                print(f"   {name:<20} median {result['median_ms']:8.1f} ms   min {result['min_ms']:8.1f} ms")
+            else:
+                print(f"   {name:<20} FAILED: {result['error']}")
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    failed = [name for name, result in results.items() if not result["ok"]]
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
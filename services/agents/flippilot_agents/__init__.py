@@ -2,3 +2,8 @@
 FlipPilot Agents - LangGraph-based agent system for flip finding
 """
 
+# Dotted paths for enqueueing/scheduling tasks without importing
+# flippilot_agents.tasks (and langgraph) in the calling process.
+# RQ resolves these inside the worker.
+MONITOR_WATCHLIST = "flippilot_agents.tasks.monitor_watchlist"
+SEARCH_AND_ANALYZE_FOR_FLIPS = "flippilot_agents.tasks.search_and_analyze_for_flips"
@@ -12,7 +12,7 @@ from datetime import datetime, timedelta
 from rq_scheduler import Scheduler
 from redis import from_url
 
-from flippilot_agents.tasks import monitor_watchlist
+from flippilot_agents import MONITOR_WATCHLIST
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 SCHEDULE_ID = "watchlist-monitor-01"
@@ -29,7 +29,7 @@ def main():
 
     scheduler.schedule(
         scheduled_time=datetime.utcnow() + timedelta(minutes=1),
-        func=monitor_watchlist,
+        func=MONITOR_WATCHLIST,   # dotted path; avoids importing tasks/langgraph here
         interval=10,              # 10 seconds for testing. Use 900 for 15 minutes.
         repeat=None,
         queue_name="deals",
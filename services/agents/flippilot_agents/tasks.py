@@ -1,19 +1,28 @@
 from datetime import datetime
+import heapq
 import json
+import os
 import time
 import logging
-import sys
-from typing import TypedDict, List, Dict, Any
-from langgraph.graph import StateGraph, END
+from typing import TypedDict, List, Dict, Any, Iterable
+import redis
+
+# NOTE: langgraph is imported lazily in build_flippilot_graph() so importing
+# this module stays cheap. The worker calls preload() once in the parent
+# process so forked jobs inherit it. Logging is configured by the entrypoints
+# (worker.py, test_agents.py), not here.
 
-# Configure logging to ensure it goes to stdout/stderr
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
 logger = logging.getLogger(__name__)
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Ranking limits: how many deals flow out of one pipeline run, and how many
+# are kept per watchlist / per user across monitoring passes
+TOP_K_PER_RUN = int(os.getenv("TOP_K_PER_RUN", "20"))
+TOP_K_PER_WATCHLIST = int(os.getenv("TOP_K_PER_WATCHLIST", "50"))
+TOP_K_PER_USER = int(os.getenv("TOP_K_PER_USER", "100"))
+DEAL_TTL_SECONDS = int(os.getenv("DEAL_TTL_SECONDS", str(7 * 24 * 3600)))
+
 # LangGraph State Definition
 class FlipPilotState(TypedDict, total=False):
     # Input data
@@ -26,8 +35,8 @@ class FlipPilotState(TypedDict, total=False):
     items_found: int
     platforms_searched: List[str]
     
-    # Analysis Agent output
-    profitable_items: List[Dict[str, Any]]
+    # Analysis Agent output (only the top-K profitable items are kept)
+    top_deals: List[Dict[str, Any]]
     profitable_items_found: int
     total_items_analyzed: int
     
@@ -76,6 +85,46 @@ def search_agent_node(state: FlipPilotState) -> FlipPilotState:
     
     return state
 
+# Width of each investment_score band in the Redis score. Profit is clamped
+# below it so a large profit can never reach the next investment_score.
+PROFIT_SCORE_BAND = 1_000_000
+
+def deal_rank_key(item: Dict[str, Any]):
+    """Sort key: investment_score first, estimated profit breaks ties"""
+    return (item.get("investment_score", 0), item.get("estimated_profit", 0.0))
+
+def deal_score(item: Dict[str, Any]) -> float:
+    """deal_rank_key flattened into a single Redis sorted-set score.
+
+    Profits at or above PROFIT_SCORE_BAND tie with each other within their
+    investment_score, but never outrank a higher investment_score.
+    """
+    profit = min(max(item.get("estimated_profit", 0.0), 0.0), PROFIT_SCORE_BAND - 1)
+    return item.get("investment_score", 0) * PROFIT_SCORE_BAND + profit
+
+def push_top_deal(heap: list, item: Dict[str, Any], k: int, seq: int) -> None:
+    """Push item into a min-heap holding at most k deals.
+
+    seq is the item's arrival order; on equal rank keys the earlier item wins
+    and the items themselves are never compared.
+    """
+    entry = (deal_rank_key(item), -seq, item)
+    if len(heap) < k:
+        heapq.heappush(heap, entry)
+    elif k > 0:
+        heapq.heappushpop(heap, entry)
+
+def top_deals_from_heap(heap: list) -> List[Dict[str, Any]]:
+    """Deals held in a push_top_deal heap, best first"""
+    return [item for _, _, item in sorted(heap, reverse=True)]
+
+def rank_top_deals(items: Iterable[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+    """Best k items by deal_rank_key, using a bounded heap (O(n log k) time, O(k) memory)"""
+    heap = []
+    for seq, item in enumerate(items):
+        push_top_deal(heap, item, k, seq)
+    return top_deals_from_heap(heap)
+
 def analysis_agent_node(state: FlipPilotState) -> FlipPilotState:
     """Agent 2: Analyze items for profitability"""
     
@@ -84,8 +133,11 @@ def analysis_agent_node(state: FlipPilotState) -> FlipPilotState:
     
     time.sleep(10)  # Simulate 10 seconds of analysis
     
-    # Analyze each item for profitability
-    profitable_items = []
+    # Analyze each item for profitability, keeping only the top-K in a
+    # bounded heap so memory stays flat however many items match
+    top_heap = []
+    profitable_count = 0
+    total_margin = 0.0
     
     for item in state['found_items']:
         # Dummy analysis logic
@@ -105,24 +157,31 @@ def analysis_agent_node(state: FlipPilotState) -> FlipPilotState:
                 "risk_level": "low" if profit_margin > 50 else "medium",
                 "analyzed_at": datetime.now().isoformat()
             }
-            profitable_items.append(profitable_item)
+            push_top_deal(top_heap, profitable_item, TOP_K_PER_RUN, profitable_count)
+            profitable_count += 1
+            total_margin += profit_margin
+    
+    top_deals = top_deals_from_heap(top_heap)
     
     # Update state
-    state["profitable_items"] = profitable_items
-    state["profitable_items_found"] = len(profitable_items)
+    state["top_deals"] = top_deals
+    state["profitable_items_found"] = profitable_count
     state["total_items_analyzed"] = len(state['found_items'])
     state["current_step"] = "analysis_complete"
     
     logger.info(f"   ✅ ANALYSIS AGENT: Analysis complete!")
     logger.info(f"   📊 Analyzed {len(state['found_items'])} items")
-    logger.info(f"   💰 Found {len(profitable_items)} profitable opportunities")
-    logger.info(f"   🎯 Average profit margin: {sum(item['profit_margin'] for item in profitable_items) / len(profitable_items) if profitable_items else 0:.1f}%")
+    logger.info(f"   💰 Found {profitable_count} profitable opportunities")
+    logger.info(f"   🏆 Kept top {len(top_deals)} deals")
+    logger.info(f"   🎯 Average profit margin: {total_margin / profitable_count if profitable_count else 0:.1f}%")
     
     return state
 
 def build_flippilot_graph():
     """Build the LangGraph workflow for FlipPilot"""
     
+    from langgraph.graph import StateGraph, END
+    
     g = StateGraph(FlipPilotState)
     
     # Add nodes (agents)
@@ -138,6 +197,25 @@ def build_flippilot_graph():
     
     return g.compile()
 
+_compiled_graph = None
+
+def get_flippilot_graph():
+    """Return the compiled workflow, building it once per process"""
+    
+    global _compiled_graph
+    if _compiled_graph is None:
+        _compiled_graph = build_flippilot_graph()
+    return _compiled_graph
+
+def preload():
+    """Import heavy dependencies and compile the graph ahead of time.
+
+    Called by the worker before it starts forking work horses, so every job
+    inherits the already-imported modules instead of re-importing them.
+    """
+    
+    get_flippilot_graph()
+
 # Old standalone functions removed - now using LangGraph nodes
 
 def search_and_analyze_for_flips(search_criteria):
@@ -146,8 +224,8 @@ def search_and_analyze_for_flips(search_criteria):
     logger.info(f"\n🚀 LANGGRAPH PIPELINE: Starting search and analysis workflow")
     logger.info(f"   📋 Search criteria: {search_criteria.get('search_terms', 'N/A')}")
     
-    # Build the graph
-    graph = build_flippilot_graph()
+    # Get the graph (compiled once per process, or inherited from the preloaded worker)
+    graph = get_flippilot_graph()
     
     # Initial state
     initial_state = FlipPilotState(
@@ -167,13 +245,61 @@ def search_and_analyze_for_flips(search_criteria):
     logger.info(f"   🔄 Pipeline status: {final_state['pipeline_status']}")
     
     return {
-        "profitable_items": final_state.get('profitable_items', []),
         "profitable_items_found": final_state.get('profitable_items_found', 0),
+        "top_deals": final_state.get('top_deals', []),
         "total_items_analyzed": final_state.get('total_items_analyzed', 0),
         "pipeline_status": final_state.get('pipeline_status', 'completed'),
         "workflow_completed_at": datetime.now().isoformat()
     }
 
+def prune_deals(conn, key, k, cutoff):
+    """Trim a deals sorted set to live, top-K members.
+
+    Members whose last-seen time (kept in {key}:seen) is older than cutoff
+    have expired details, so they are dropped first. Then everything below
+    the top k is dropped. Both sets are kept in sync.
+    """
+    
+    seen_key = f"{key}:seen"
+    
+    stale = conn.zrangebyscore(seen_key, "-inf", cutoff)
+    if stale:
+        conn.zrem(key, *stale)
+        conn.zrem(seen_key, *stale)
+    
+    # Ranks are ascending by score, so 0..-(k+1) is everything below the top k
+    overflow = conn.zrange(key, 0, -(k + 1))
+    if overflow:
+        conn.zrem(key, *overflow)
+        conn.zrem(seen_key, *overflow)
+
+def store_top_deals(conn, search_id, user_id, deals, now=None):
+    """Merge deals into the per-watchlist and per-user Redis sorted sets.
+
+    Each set is trimmed back to its live top-K after the merge, so storage
+    stays bounded no matter how many deals a pass produces. Deal details live
+    in deal:{search_id}:{item_id} keys with a TTL, and members not seen again
+    within that TTL are pruned from the sets.
+    """
+    
+    now = time.time() if now is None else now
+    watchlist_key = f"watchlist:{search_id}:deals"
+    user_key = f"user:{user_id}:deals"
+    
+    pipe = conn.pipeline()
+    for deal in deals:
+        member = f"{search_id}:{deal['id']}"
+        score = deal_score(deal)
+        pipe.set(f"deal:{member}", json.dumps({**deal, "search_id": search_id}), ex=DEAL_TTL_SECONDS)
+        for key in (watchlist_key, user_key):
+            pipe.zadd(key, {member: score})
+            pipe.zadd(f"{key}:seen", {member: now})
+    pipe.execute()
+    
+    cutoff = now - DEAL_TTL_SECONDS
+    prune_deals(conn, watchlist_key, TOP_K_PER_WATCHLIST, cutoff)
+    prune_deals(conn, user_key, TOP_K_PER_USER, cutoff)
+
 def monitor_watchlist():
     """Monitor all active watchlist items (scheduled task)"""
     
@@ -218,6 +344,9 @@ def monitor_watchlist():
     total_new_items = 0
     total_notifications = 0
     
+    # Connect per run rather than at import, so forked work horses don't share a socket
+    conn = redis.from_url(REDIS_URL)
+    
     for search in active_searches:
         logger.info(f"\n   🔍 Monitoring search: {search['search_terms']}")
         logger.info(f"      User: {search['user_id']}")
@@ -230,20 +359,32 @@ def monitor_watchlist():
             
             new_profitable_items = result.get('profitable_items_found', 0)
             total_items_analyzed = result.get('total_items_analyzed', 0)
+            top_deals = result.get('top_deals', [])
             
             logger.info(f"      📊 Analyzed {total_items_analyzed} items")
             logger.info(f"      💰 Found {new_profitable_items} profitable opportunities")
             
             total_new_items += new_profitable_items
             
+            # Only the top-K deals are stored and notified on. A storage
+            # failure is logged but must not stop the notification below.
+            try:
+                store_top_deals(conn, search['id'], search['user_id'], top_deals)
+            except Exception as e:
+                logger.error(f"      ❌ Error storing deals for search {search['id']}: {e}")
+            
             # If new profitable items found, send notifications
-            if new_profitable_items > 0:
+            if top_deals:
                 notifications = [
                     {
                         "message": f"Found {new_profitable_items} new profitable {search['search_terms']} opportunities!",
                         "type": "new_opportunities",
                         "search_id": search['id'],
-                        "items_count": new_profitable_items
+                        "items_count": new_profitable_items,
+                        "top_deals": [
+                            {"id": deal['id'], "title": deal['title'], "estimated_profit": deal['estimated_profit']}
+                            for deal in top_deals[:3]
+                        ]
                     }
                 ]
                 
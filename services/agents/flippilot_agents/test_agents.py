@@ -4,11 +4,15 @@ Test script for FlipPilot LangGraph agents
 Run this to test your agents locally
 """
 
+import json
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from tasks import search_and_analyze_for_flips
+import fakeredis
+
+import tasks
+from tasks import search_and_analyze_for_flips, analysis_agent_node, rank_top_deals, deal_score, store_top_deals, PROFIT_SCORE_BAND
 
 def test_basic_workflow():
     """Test the basic search and analysis workflow"""
@@ -42,9 +46,9 @@ def test_basic_workflow():
     print(f"   🔄 Pipeline status: {result['pipeline_status']}")
     print(f"   ⏰ Completed at: {result['workflow_completed_at']}")
     
-    if result['profitable_items']:
+    if result['top_deals']:
         print(f"\n💰 TOP PROFITABLE ITEMS:")
-        for i, item in enumerate(result['profitable_items'][:3], 1):
+        for i, item in enumerate(result['top_deals'][:3], 1):
             print(f"   {i}. {item['title']}")
             print(f"      💵 Asking: ${item['asking_price']:.2f}")
             print(f"      📈 Market Value: ${item['market_value']:.2f}")
@@ -87,7 +91,127 @@ def test_different_searches():
         print(f"   Found {result['profitable_items_found']} profitable items")
         print(f"   Analyzed {result['total_items_analyzed']} total items")
 
+def test_ranking():
+    """Test that ranking keeps only the top-K deals, best first"""
+    
+    print("\n🏆 TESTING TOP-K RANKING")
+    print("=" * 60)
+    
+    items = [
+        {"id": "low_score", "investment_score": 3, "estimated_profit": 900.0},
+        {"id": "best", "investment_score": 5, "estimated_profit": 400.0},
+        {"id": "tie_lower_profit", "investment_score": 5, "estimated_profit": 250.0},
+        {"id": "mid", "investment_score": 4, "estimated_profit": 100.0},
+    ]
+    
+    top = rank_top_deals(items, 2)
+    assert [item["id"] for item in top] == ["best", "tie_lower_profit"]
+    assert rank_top_deals(items, 10)[-1]["id"] == "low_score"
+    assert rank_top_deals([], 5) == []
+    
+    print("   ✅ Ranking keeps the best deals in order")
+
+def test_deal_score_band_boundary():
+    """Test that a huge profit never outranks a higher investment score"""
+    
+    print("\n🏆 TESTING DEAL SCORE BOUNDARY")
+    print("=" * 60)
+    
+    huge_profit = {"id": "huge_profit", "investment_score": 4, "estimated_profit": 5 * PROFIT_SCORE_BAND}
+    at_band = {"id": "at_band", "investment_score": 4, "estimated_profit": float(PROFIT_SCORE_BAND)}
+    higher_score = {"id": "higher_score", "investment_score": 5, "estimated_profit": 10.0}
+    
+    # Heap ranking compares the tuple directly
+    top = rank_top_deals([huge_profit, at_band, higher_score], 2)
+    assert [item["id"] for item in top] == ["higher_score", "huge_profit"]
+    
+    # Redis score stays inside its investment_score band
+    assert deal_score(huge_profit) < deal_score(higher_score)
+    assert deal_score(at_band) < deal_score(higher_score)
+    assert deal_score(huge_profit) == deal_score(at_band) == 5 * PROFIT_SCORE_BAND - 1
+    assert deal_score({"id": "loss", "investment_score": 4, "estimated_profit": -50.0}) == 4 * PROFIT_SCORE_BAND
+    
+    print("   ✅ Profit never spills into the next score band")
+
+def test_analysis_keeps_top_k():
+    """Test that analysis keeps only the top-K deals plus a count of the rest"""
+    
+    print("\n🏆 TESTING BOUNDED ANALYSIS")
+    print("=" * 60)
+    
+    found_items = [
+        {"id": f"item_{i}", "title": f"Item {i}", "asking_price": 100.0 + i}
+        for i in range(50)
+    ]
+    
+    old_k, old_sleep = tasks.TOP_K_PER_RUN, tasks.time.sleep
+    tasks.TOP_K_PER_RUN = 3
+    tasks.time.sleep = lambda seconds: None  # skip the simulated analysis delay
+    try:
+        state = analysis_agent_node({"found_items": found_items})
+    finally:
+        tasks.TOP_K_PER_RUN, tasks.time.sleep = old_k, old_sleep
+    
+    # Same investment score for all, so the highest profits win
+    assert [item["id"] for item in state["top_deals"]] == ["item_49", "item_48", "item_47"]
+    assert state["profitable_items_found"] == 50
+    assert state["total_items_analyzed"] == 50
+    assert "profitable_items" not in state
+    
+    print("   ✅ Analysis keeps only the top-K deals")
+
+def make_deal(item_id, investment_score, estimated_profit):
+    return {"id": item_id, "title": item_id, "investment_score": investment_score, "estimated_profit": estimated_profit}
+
+def test_store_top_deals():
+    """Test that stored deals are merged across passes and trimmed to top-K"""
+    
+    print("\n🏆 TESTING TOP-K STORAGE")
+    print("=" * 60)
+    
+    conn = fakeredis.FakeRedis()
+    old_limits = tasks.TOP_K_PER_WATCHLIST, tasks.TOP_K_PER_USER
+    tasks.TOP_K_PER_WATCHLIST, tasks.TOP_K_PER_USER = 3, 4
+    try:
+        # Fewer than K members: nothing is trimmed
+        store_top_deals(conn, "w1", "u1", [make_deal("a", 5, 100.0), make_deal("b", 3, 100.0)], now=1000)
+        assert conn.zrevrange("watchlist:w1:deals", 0, -1) == [b"w1:a", b"w1:b"]
+        assert conn.zcard("watchlist:w1:deals:seen") == 2
+        
+        # Second pass merges and trims back to K, keeping the seen set in sync
+        store_top_deals(conn, "w1", "u1", [make_deal("c", 4, 100.0), make_deal("d", 2, 100.0)], now=2000)
+        assert conn.zrevrange("watchlist:w1:deals", 0, -1) == [b"w1:a", b"w1:c", b"w1:b"]
+        assert conn.zcard("watchlist:w1:deals:seen") == 3
+        
+        # Another watchlist for the same user merges into the user's set
+        store_top_deals(conn, "w2", "u1", [make_deal("e", 6, 100.0)], now=3000)
+        assert conn.zrevrange("user:u1:deals", 0, -1) == [b"w2:e", b"w1:a", b"w1:c", b"w1:b"]
+        
+        # Members not seen again within the TTL are pruned on the next pass
+        later = 1000 + tasks.DEAL_TTL_SECONDS + 1
+        store_top_deals(conn, "w2", "u1", [make_deal("f", 1, 100.0)], now=later)
+        assert conn.zrevrange("user:u1:deals", 0, -1) == [b"w2:e", b"w1:c", b"w2:f"]
+        assert conn.zrevrange("user:u1:deals:seen", 0, -1) == [b"w2:f", b"w2:e", b"w1:c"]
+        
+        # Details are stored alongside
+        assert json.loads(conn.get("deal:w2:f"))["search_id"] == "w2"
+    finally:
+        tasks.TOP_K_PER_WATCHLIST, tasks.TOP_K_PER_USER = old_limits
+    
+    print("   ✅ Storage merges passes and keeps only live top-K deals")
+
 if __name__ == "__main__":
+    import logging
+    
+    # Show the agents' log output
+    logging.basicConfig(level=logging.INFO, format='%(message)s', handlers=[logging.StreamHandler(sys.stdout)])
+    
+    # Run ranking tests
+    test_ranking()
+    test_deal_score_band_boundary()
+    test_analysis_keeps_top_k()
+    test_store_top_deals()
+    
     # Run basic test
     test_basic_workflow()
     
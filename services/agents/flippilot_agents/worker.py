@@ -12,13 +12,26 @@ redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 conn = redis.from_url(redis_url)
 queues = [Queue("deals", connection=conn)]
 
+# Preloaded mode: import tasks (and langgraph) once in the parent so each
+# forked work horse inherits them instead of re-importing per job.
+PRELOAD = os.getenv("FLIPPILOT_PRELOAD", "1") == "1"
+
 if __name__ == "__main__":
     import logging
     
-    # Set up logging for RQ
-    logging.basicConfig(level=logging.INFO)
+    # Set up logging for RQ and the tasks, to stdout so docker logs pick it up
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    
+    if PRELOAD:
+        print("Preloading tasks...")
+        from flippilot_agents import tasks
+        tasks.preload()
     
     print("Starting worker...")
     
     # Start worker - scheduler runs separately as a different service
-    Worker(queues, connection=conn).work()
\ No newline at end of file
+    Worker(queues, connection=conn).work()
@@ -2,7 +2,7 @@
 Simple Watchlist API using Redis as database
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
@@ -154,6 +154,16 @@ def delete_watchlist(watchlist_id: str):
     # Remove from user's watchlists list
     redis_conn.srem(f"user:{watchlist['user_id']}:watchlists", watchlist_id)
     
+    # Remove its ranked deals (members are "{watchlist_id}:{item_id}")
+    user_deals_key = f"user:{watchlist['user_id']}:deals"
+    members = [member for member, _ in redis_conn.zscan_iter(user_deals_key, match=f"{watchlist_id}:*")]
+    members += redis_conn.zrange(f"watchlist:{watchlist_id}:deals", 0, -1)
+    if members:
+        redis_conn.zrem(user_deals_key, *members)
+        redis_conn.zrem(f"{user_deals_key}:seen", *members)
+        redis_conn.delete(*{f"deal:{member.decode()}" for member in members})
+    redis_conn.delete(f"watchlist:{watchlist_id}:deals", f"watchlist:{watchlist_id}:deals:seen")
+    
     logger.info(f"Watchlist deleted successfully: {watchlist_id}")
     return {"status": "deleted", "watchlist_id": watchlist_id}
 
@@ -194,6 +204,43 @@ def get_user_watchlists(user_id: str):
     
     return watchlists
 
+@router.get("/users/{user_id}/deals")
+def get_user_deals(user_id: str, offset: int = Query(0, ge=0), limit: int = Query(20, ge=1, le=100)):
+    """Page through a user's best current deals, best first.
+
+    offset is a position in the user's ranked deals and rank is that position
+    plus one. Deals whose details have expired are skipped (the monitor prunes
+    them on its next pass), so pass next_offset back to get the next page.
+    """
+    if not get_user(user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Sorted set is maintained (and capped at top-K) by the monitor_watchlist task
+    deals_key = f"user:{user_id}:deals"
+    total = redis_conn.zcard(deals_key)
+    
+    deals = []
+    position = offset
+    while len(deals) < limit:
+        members = redis_conn.zrevrange(deals_key, position, position + limit - len(deals) - 1)
+        if not members:
+            break
+        
+        details = redis_conn.mget([f"deal:{member.decode()}" for member in members])
+        for data in details:
+            position += 1
+            if data:
+                deals.append({**json.loads(data), "rank": position})
+    
+    return {
+        "user_id": user_id,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": position if position < total else None,
+        "deals": deals,
+    }
+
 @router.get("/watchlists/{watchlist_id}")
 def get_watchlist_items(watchlist_id: str):
     """Get all items in a watchlist"""
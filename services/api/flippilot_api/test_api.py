@@ -0,0 +1,104 @@
+"""
+Tests for the FlipPilot API deal endpoints
+Uses fakeredis in place of the real Redis connection
+"""
+
+import json
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+from flippilot_api.main import app
+from flippilot_api.routes import watchlist
+
+@pytest.fixture
+def conn(monkeypatch):
+    fake = fakeredis.FakeRedis()
+    monkeypatch.setattr(watchlist, "redis_conn", fake)
+    return fake
+
+@pytest.fixture
+def client(conn):
+    return TestClient(app)
+
+def add_deal(conn, user_id, watchlist_id, item_id, score, expired=False):
+    """Store a ranked deal the way the monitor_watchlist task does"""
+    member = f"{watchlist_id}:{item_id}"
+    if not expired:
+        conn.set(f"deal:{member}", json.dumps({"id": item_id, "search_id": watchlist_id}))
+    for key in (f"watchlist:{watchlist_id}:deals", f"user:{user_id}:deals"):
+        conn.zadd(key, {member: score})
+        conn.zadd(f"{key}:seen", {member: 0})
+
+def create_user(client):
+    return client.post("/users", json={"email": "a@example.com", "name": "A"}).json()["id"]
+
+def test_user_deals_unknown_user(client):
+    assert client.get("/users/missing/deals").status_code == 404
+
+def test_user_deals_paging(client, conn):
+    user_id = create_user(client)
+    for i in range(5):
+        add_deal(conn, user_id, "w1", f"item_{i}", score=i)
+
+    first = client.get(f"/users/{user_id}/deals", params={"offset": 0, "limit": 2}).json()
+    assert first["total"] == 5
+    assert [d["id"] for d in first["deals"]] == ["item_4", "item_3"]
+    assert [d["rank"] for d in first["deals"]] == [1, 2]
+    assert first["next_offset"] == 2
+    assert all("score" not in d for d in first["deals"])
+
+    last = client.get(f"/users/{user_id}/deals", params={"offset": 4, "limit": 2}).json()
+    assert [(d["id"], d["rank"]) for d in last["deals"]] == [("item_0", 5)]
+    assert last["next_offset"] is None
+
+    past_end = client.get(f"/users/{user_id}/deals", params={"offset": 10}).json()
+    assert past_end["deals"] == []
+
+def test_user_deals_paging_bounds(client, conn):
+    user_id = create_user(client)
+    assert client.get(f"/users/{user_id}/deals", params={"offset": -1}).status_code == 422
+    assert client.get(f"/users/{user_id}/deals", params={"limit": 0}).status_code == 422
+    assert client.get(f"/users/{user_id}/deals", params={"limit": 101}).status_code == 422
+
+def test_user_deals_skips_expired(client, conn):
+    user_id = create_user(client)
+    add_deal(conn, user_id, "w1", "best", score=10, expired=True)
+    add_deal(conn, user_id, "w1", "second", score=9)
+    add_deal(conn, user_id, "w1", "third", score=8, expired=True)
+    add_deal(conn, user_id, "w1", "fourth", score=7)
+    add_deal(conn, user_id, "w1", "fifth", score=6)
+
+    # Reads past expired members to fill the page, ranks are set positions
+    page = client.get(f"/users/{user_id}/deals", params={"limit": 2}).json()
+    assert [(d["id"], d["rank"]) for d in page["deals"]] == [("second", 2), ("fourth", 4)]
+    assert page["next_offset"] == 4
+
+    rest = client.get(f"/users/{user_id}/deals", params={"offset": page["next_offset"], "limit": 2}).json()
+    assert [(d["id"], d["rank"]) for d in rest["deals"]] == [("fifth", 5)]
+    assert rest["next_offset"] is None
+
+    # Read-only: cleanup is left to the monitor's prune
+    assert page["total"] == 5
+    assert conn.zcard(f"user:{user_id}:deals") == 5
+    assert conn.zcard(f"user:{user_id}:deals:seen") == 5
+
+def test_delete_watchlist_removes_deals(client, conn):
+    user_id = create_user(client)
+    watchlist_id = client.post("/watchlists", json={"user_id": user_id, "name": "camera"}).json()["id"]
+    add_deal(conn, user_id, watchlist_id, "gone", score=10)
+    add_deal(conn, user_id, "other", "kept", score=5)
+    # Trimmed from the watchlist's set but still in the user's
+    conn.zrem(f"watchlist:{watchlist_id}:deals", f"{watchlist_id}:gone")
+
+    assert client.delete(f"/watchlists/{watchlist_id}").status_code == 200
+
+    assert conn.zrange(f"user:{user_id}:deals", 0, -1) == [b"other:kept"]
+    assert conn.zrange(f"user:{user_id}:deals:seen", 0, -1) == [b"other:kept"]
+    assert not conn.exists(f"watchlist:{watchlist_id}:deals", f"watchlist:{watchlist_id}:deals:seen")
+    assert not conn.exists(f"deal:{watchlist_id}:gone")
+    assert conn.exists("deal:other:kept")